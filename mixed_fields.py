@@ -1,6 +1,9 @@
+import functools
+import mmap
 import os
-import traceback
+import re
 
+from collections import namedtuple
 from types import SimpleNamespace
 
 
@@ -10,9 +13,29 @@ FIELDINFO = SimpleNamespace(
     TAG='TAG',
 )
 
+# Status returned by writes (a namedtuple, unlike a SimpleNamespace,
+# doesn't cost an attribute dict per write)
+WriteStatus = namedtuple('WriteStatus', ['STATUS', 'BYTE_COUNT', 'ERRORS'])
+
+# A whole size subfield: carrier bytes (MSB set) up to a terminator
+# byte (MSB clear)
+_SIZE_SUBFIELD_RE = re.compile(rb'[\x80-\xff]*[\x00-\x7f]')
+
 
 class MixedFieldsError(Exception):
-    pass
+    # The error code ('BAD_TAG', 'DIRTY_STATE', ...) is always args[0].
+    # The message may be passed as a callable so that raise sites on
+    # the parse path don't pay for f-string formatting unless the
+    # message is actually rendered
+
+    @property
+    def code(self):
+        return self.args[0]
+
+    def __str__(self):
+        if len(self.args) > 1 and callable(self.args[1]):
+            return str((self.args[0], self.args[1]()) + self.args[2:])
+        return super().__str__()
 
 
 class MixedFields:
@@ -31,6 +54,21 @@ class MixedFields:
     # (the size field specifies the count of user
     # bytes to follow)
 
+    # Fixed attribute slots (no per-instance dict, and attribute
+    # access in the read/write loops skips the dict probe)
+    __slots__ = (
+        '_path',
+        '_bytes_written',
+        '_finalized_file_write',
+        '_head',
+        '_header',
+        '_metadata',
+        '_eof',
+        '_mm',
+        '_fd',
+        '_offsets',
+    )
+
     # ASCII/UTF8 separator bytes
     SEP_FILE = b'\x1C'
     SEP_GROUP = b'\x1D'
@@ -74,6 +112,13 @@ class MixedFields:
         + ENDBYTE_META_STOP
     )
 
+    # Header + empty metadata, the prefix every new file starts with
+    _INITIAL_BLOB = (
+        HEADER
+        + METADATA_FIELD_8_EMPTY
+    )
+    FILE_PREFIX = _INITIAL_BLOB  # Convenience
+
     # Extra (user) metadata field
     TAG_EXTRA_METADATA = (
         SEP_RECORD
@@ -112,8 +157,46 @@ class MixedFields:
         TAG_EXTRA_METADATA
     }
 
+    # Tags whose payload carries a leading size subfield
+    _VAR_LEN_TAGS = frozenset({
+        TAG_DATA,
+        TAG_METADATA,
+        TAG_EXTRA_METADATA,
+    })
+
+    # Tag lookup by 4 letter tag name (tags are a sep byte plus a
+    # unique name, so a field tag is valid only if the tag stored
+    # under its name matches the full 5 bytes)
+    _TAG_BY_NAME = {
+        b'Mixd': TAG_HEADER,
+        b'sMDT': TAG_METADATA,
+        b'eMDT': TAG_EXTRA_METADATA,
+        b'sDAT': TAG_DATA,
+        b'xEOF': TAG_ENDFILE,
+    }
+
+    # Carrier-bit masks for size subfield decode windows of each
+    # possible length (index is the window length in bytes)
+    _SIZE_CARRIER_MASKS = tuple(
+        int.from_bytes(b'\x80' * num_bytes, 'big') for num_bytes in range(9)
+    )
+
+    # Expected endbyte per tag, with the error code/name to use on mismatch
+    _TAG_TO_ENDBYTE = {
+        TAG_HEADER: (ENDBYTE_HEADER, 'BAD_HEADER_ENDBYTE', 'header'),
+        TAG_METADATA: (ENDBYTE_META_STOP, 'BAD_METADATA_ENDBYTE', 'metadata'),
+        TAG_EXTRA_METADATA: (ENDBYTE_EXTRA_METADATA, 'BAD_EXTRA_METADATA_ENDBYTE', 'extra metadata'),
+        TAG_DATA: (ENDBYTE_DATA, 'BAD_DATA_ENDBYTE', 'data'),
+        TAG_ENDFILE: (ENDBYTE_ENDFILE, 'BAD_ENDFILE_ENDBYTE', 'endfile'),
+    }
+
     def __init__(self, path=None):
         self._path = path
+        self._mm = None  # Memory map of the file, for reads
+        self._fd = None  # Persistent append descriptor, for writes
+        self._reset_state()
+
+    def _reset_state(self):
         self._bytes_written = 0
         self._finalized_file_write = False
         self._head = 0  # Seek position for reading files
@@ -121,6 +204,7 @@ class MixedFields:
         self._header = b''
         self._metadata = b''
         self._eof = b''
+        self._offsets = None  # Start offsets of user fields, for random access
 
     def _path_set(self):
         return self._path is not None
@@ -132,19 +216,86 @@ class MixedFields:
         if self._dirty_state() and not ignore_errors:
             raise MixedFieldsError('DIRTY_STATE', 'Error, cannot set path without close()\'ing current file')
 
+        self._close_read()
+        self._close_write()
         self._path = path
-        self._bytes_written = 0
-        self._finalized_file_write = False
-        self._head = 0
-        self._header = b''
-        self._metadata = b''
-        self._eof = b''
+        self._reset_state()
+
+    def _open_read(self):
+        # Map the whole file once, reads become slices into the map
+        if self._mm is None:
+            with open(self._path, 'rb') as fhandle:
+                self._mm = mmap.mmap(fhandle.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def _close_read(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def _open_write(self):
+        # Open the file once (lazily), later writes reuse the raw
+        # descriptor (append-only writes don't need the buffered
+        # IO stack that open('ab') would set up)
+        if self._fd is None:
+            self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _close_write(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    # Push any pending writes to disk. Normal writes are left to the
+    # OS to flush (forcing a flush per field kills write throughput),
+    # so callers who need crash durability ask for it explicitly
+    def fsync(self):
+        if self._fd is not None:
+            os.fsync(self._fd)
 
     def _is_variable_length(self, tag):
         # TODO raise exception on invalid tag
-        if tag in {self.TAG_DATA, self.TAG_METADATA, self.TAG_EXTRA_METADATA}:
-            return True
-        return False
+        return tag in self._VAR_LEN_TAGS
+
+    @staticmethod
+    def _decode_size_subfield_at(mm, pos):
+        """Decode the size subfield at pos, return (size_value, end_position)"""
+        # Fast path, most sizes fit in a single size byte (MSB clear)
+        first_byte = mm[pos]
+        if not (first_byte & 0b1000_0000):
+            return (first_byte, pos + 1)
+
+        # Pull an 8 byte window as one integer and locate the first
+        # terminator byte (MSB clear) with a single mask operation
+        # rather than a test-and-branch per byte
+        window = mm[pos:pos + 8]
+        window_len = len(window)
+        window_int = int.from_bytes(window, 'big')
+        terminator_mask = ~window_int & MixedFields._SIZE_CARRIER_MASKS[window_len]
+
+        if not terminator_mask:
+            # No terminator in the window (a >56 bit size), fall back
+            # to the per-byte loop
+            size_value = 0
+            while True:
+                byte_val = mm[pos]
+                pos += 1
+                size_value = (size_value << MixedFields.SIZE_BITS_PER_SIZE_BYTE) | (byte_val & 0b0111_1111)
+                if not (byte_val & 0b1000_0000):
+                    break
+            return (size_value, pos)
+
+        # The terminator's mask bit sits at a byte boundary, so its
+        # bit_length gives the subfield length directly
+        sub_len = window_len - (terminator_mask.bit_length() >> 3) + 1
+
+        # Drop any window bytes past the terminator, then gather the
+        # 7 value bits of each subfield byte
+        window_int >>= 8 * (window_len - sub_len)
+        size_value = 0
+        for shift in range((sub_len - 1) * 8, -1, -8):
+            size_value = (size_value << MixedFields.SIZE_BITS_PER_SIZE_BYTE) | ((window_int >> shift) & 0b0111_1111)
+        return (size_value, pos + sub_len)
 
     @staticmethod
     def split_sized_chunk(chunk):
@@ -152,78 +303,79 @@ class MixedFields:
         if len(chunk) == 0:
             raise MixedFieldsError('EMPTY_CHUNK', 'Error, cannot read size from empty chunk')
 
-        # Get the size subfield
-        size_subfield = b''
-        for byte_val in chunk:
-            size_subfield += bytes([byte_val])
-            if not (byte_val & 0b1000_0000):
-                break
-        size_value = MixedFields.read_size_subfield(size_subfield)
+        # Fast path, most sizes fit in a single size byte (MSB clear)
+        first_byte = chunk[0]
+        if not (first_byte & 0b1000_0000):
+            return (first_byte, chunk[1:])
+
+        # Locate the whole subfield with one C-level regex scan (no
+        # terminator means the chunk is all subfield), then decode it
+        match = _SIZE_SUBFIELD_RE.match(chunk)
+        sub_len = match.end() if match else len(chunk)
+        size_value = MixedFields.read_size_subfield(chunk[:sub_len])
 
         # Get the chunk remainder
         partial_chunk = b''
-        if len(size_subfield) < len(chunk):  # A zero length payload is valid
-            partial_chunk = chunk[len(size_subfield):]
+        if sub_len < len(chunk):  # A zero length payload is valid
+            partial_chunk = chunk[sub_len:]
 
         return (size_value, partial_chunk)
 
-    def _read_field(self):
-        with open(self._path, 'rb') as fhandle:
-            fhandle.seek(self._head)  # Start at last unread position
+    def _iter_fields(self):
+        # The one streaming field decoder, shared by the read APIs.
+        # Yields (tag, payload, endbyte, offset) per field, advancing
+        # the read position as each field is consumed.
+        mm = self._open_read()
+        head = self._head  # Start at last unread position
+        total = len(mm)
+        tag_lookup = self._TAG_BY_NAME
 
-            tag = fhandle.read(5)  # TODO const for this
-            if len(tag) < 5:
-                raise MixedFieldsError('BAD_TAG', f'Error, invalid tag length ({tag})')
-            chunk = b''
+        while head < total:
+            offset = head
+
+            tag = mm[head:head + self.TAG_SIZE]
+            head += self.TAG_SIZE
+            if len(tag) < self.TAG_SIZE:
+                raise MixedFieldsError('BAD_TAG', lambda: f'Error, invalid tag length ({tag})')
 
             # Validate tag
-            if tag not in MixedFields.VALID_TAGS:
+            if tag_lookup.get(tag[1:]) != tag:
                 raise MixedFieldsError('INVALID_TAG', 'Error, invalid tag!')
 
             # Read variable length payloads here
-            if self._is_variable_length(tag):
-                # Check for/get size field value
-                size_subfield = b''
-                size_value = 0
-                if self._is_variable_length(tag):
-                    current_byte = fhandle.read(1)
-                    size_subfield += current_byte
-
-                    while current_byte[0] & 0b1000_0000:
-                        # Read and add the next byte to the subfield
-                        current_byte = fhandle.read(1)
-                        size_subfield += current_byte
-
-                    size_value = self.read_size_subfield(size_subfield)
-
-                # Read in payload for variable-size fields here
-                if size_subfield:
-                    chunk += fhandle.read(size_value)
-                else:
-                    pass  # TODO enforce minimums for builtin metadata fields (min 8 byte) etc
+            chunk = b''
+            end_byte = b''
+            if tag in self._VAR_LEN_TAGS:
+                size_value, head = self._decode_size_subfield_at(mm, head)
+                chunk = mm[head:head + size_value]
+                head += size_value
+                # TODO enforce minimums for builtin metadata fields (min 8 byte) etc
 
             # Read fixed length field payloads here
-            if tag == MixedFields.TAG_HEADER:
-                chunk += fhandle.read(4)  # TODO const for header payload len
-            if tag == MixedFields.TAG_ENDFILE:
-                pass  # EOF is a zero length field
+            elif tag == self.TAG_HEADER:
+                # Fixed layout, so payload + endbyte come out of one slice
+                block = mm[head:head + len(self.PAYLOAD_HEADER) + 1]
+                chunk = block[:len(self.PAYLOAD_HEADER)]
+                end_byte = block[len(self.PAYLOAD_HEADER):]
+                head += len(self.PAYLOAD_HEADER) + 1
+            # (EOF is a zero length field)
 
             # Get/check field endbyte
-            end_byte = fhandle.read(1)
-            if tag == MixedFields.TAG_HEADER and end_byte != MixedFields.ENDBYTE_HEADER:
-                raise MixedFieldsError('BAD_HEADER_ENDBYTE', f'Error, bad header endbyte: {str(end_byte)}')
-            if tag == MixedFields.TAG_ENDFILE and end_byte != self.ENDBYTE_ENDFILE:
-                raise MixedFieldsError('BAD_ENDFILE_ENDBYTE', f'Error, bad endfile endbyte: {str(end_byte)}')
-            if tag == MixedFields.TAG_METADATA and end_byte != self.ENDBYTE_META_STOP:
-                raise MixedFieldsError('BAD_METADATA_ENDBYTE', f'Error, bad metadata endbyte: {str(end_byte)}')
-            if tag == MixedFields.TAG_DATA and end_byte != self.ENDBYTE_DATA:
-                raise MixedFieldsError('BAD_DATA_ENDBYTE', f'Error, bad data endbyte: {str(end_byte)}')
-            if tag == MixedFields.TAG_EXTRA_METADATA and end_byte != self.ENDBYTE_EXTRA_METADATA:
-                raise MixedFieldsError('BAD_EXTRA_METADATA_ENDBYTE', f'Error, bad extra metadata endbyte: {str(end_byte)}')
-
-            # Store seek position for subsequent reads
-            self._head = fhandle.tell()
+            if not end_byte:
+                end_byte = mm[head:head + 1]
+                head += 1
+            expected_endbyte, err_code, field_name = self._TAG_TO_ENDBYTE[tag]
+            if end_byte != expected_endbyte:
+                raise MixedFieldsError(err_code, lambda: f'Error, bad {field_name} endbyte: {str(end_byte)}')
+
+            # Store position for subsequent reads
+            self._head = head
 
+            yield (tag, chunk, end_byte, offset)
+
+    def _read_field(self):
+        # Parse the single field at the current read position
+        for tag, chunk, end_byte, _offset in self._iter_fields():
             # Return an annotated field dict
             field = {
                 MixedFields.INFO.TAG: tag,
@@ -231,6 +383,7 @@ class MixedFields:
                 MixedFields.INFO.ENDBYTE: end_byte,
             }
             return field
+        raise MixedFieldsError('BAD_TAG', "Error, invalid tag length (b'')")
 
     # Read a single data field, return the payload bytes (not header, metadata, or end of file tags)
     def read_item(self):
@@ -238,139 +391,206 @@ class MixedFields:
             raise MixedFieldsError('PATH_NONE', 'Error, path is not set')
         if self._dirty_state():
             raise MixedFieldsError('DIRTY_STATE', 'Error, cannot read from an unfinalized file')
-        if not os.path.exists(self._path):
+
+        # The map length doubles as a cached file size (the map is
+        # remade whenever the file changes), so no per-call stat()s
+        try:
+            mm = self._open_read()
+        except FileNotFoundError:
             raise MixedFieldsError('FILE_DOES_NOT_EXIST', 'Error, file does not exist')
-        if os.stat(self._path).st_size == 0:
+        except ValueError:  # mmap refuses zero length files
             raise MixedFieldsError('FILE_EMPTY', 'Error, file is empty')
-        file_stats = os.stat(self._path)
 
         # Return empty bytes if past end of file
-        if not (self._head < file_stats.st_size):
+        if not (self._head < len(mm)):
             return {}
 
-        # Start reading fields
+        # Start reading fields, dispatching each tag to its handler
         tag = b''
         chunk = b''  # Payload bytes
         end_byte = b''
         user_field_read = False
-        valid_tags = {
-            self.TAG_HEADER,
-            self.TAG_METADATA,
-            self.TAG_EXTRA_METADATA,
-            self.TAG_DATA,
-            self.TAG_ENDFILE
-        }
-        with open(self._path, 'rb') as fhandle:
-            # Set position to last unread byte
-            fhandle.seek(self._head)
-
-            while not user_field_read:
-                chunk = b''  # Reset
-
-                tag = fhandle.read(self.TAG_SIZE)
-                if len(tag) < self.TAG_SIZE or tag not in valid_tags:
-                    raise MixedFieldsError('BAD_TAG', 'Error, invalid tag')
-
-                # Check for/get size field value
-                size_subfield = b''
-                size_value = 0
-                if self._is_variable_length(tag):
-                    current_byte = fhandle.read(1)
-                    size_subfield += current_byte
-
-                    while current_byte[0] & 0b1000_0000:
-                        # Read and add the next byte to the subfield
-                        current_byte = fhandle.read(1)
-                        size_subfield += current_byte
-
-                    size_value = self.read_size_subfield(size_subfield)
-
-                # Read in payload for variable-size fields here
-                if size_subfield:
-                    chunk += fhandle.read(size_value)
-
-                # Handle special tags
-                if not self._header:
-                    if tag != self.TAG_HEADER:
-                        raise MixedFieldsError('BAD_HEADER', f'Error, invalid file header: {str(tag)}')
-
-                    chunk += fhandle.read(len(self.PAYLOAD_HEADER))
-                    if chunk != self.PAYLOAD_HEADER:
-                        raise MixedFieldsError('BAD_HEADER_PAYLOAD', f'Error, bad header payload: {str(chunk)}')
-                    end_byte = fhandle.read(len(self.ENDBYTE_HEADER))
-                    if end_byte != self.ENDBYTE_HEADER:
-                        raise MixedFieldsError('BAD_HEADER_ENDBYTE', f'Error, bad header endbyte: {str(end_byte)}')
-
-                    self._header = tag + chunk + end_byte
+        handlers = self._READ_ITEM_HANDLERS
 
-                    continue
-
-                if self._header and not self._metadata:
-                    if tag != self.TAG_METADATA:
-                        raise MixedFieldsError('BAD_METADATA_FIELD', 'Error, invalid file metadata tag!')
-
-                    # This is a variable size field, we read those in above
-                    if chunk != self.PAYLOAD_METADATA_EMPTY:
-                        raise MixedFieldsError('BAD_METADATA_PAYLOAD', f'Error, bad metadata payload: {str(chunk)}')
-                    end_byte = fhandle.read(len(self.ENDBYTE_META_STOP))
-                    if end_byte != self.ENDBYTE_META_STOP:
-                        raise MixedFieldsError('BAD_METADATA_ENDBYTE', f'Error, bad metadata endbyte: {str(end_byte)}')
-
-                    self._metadata = tag + chunk + end_byte
+        for tag, chunk, end_byte, _offset in self._iter_fields():
+            self._check_field_order(tag)
+            if handlers[tag](self, chunk, end_byte):
+                # Stop reading once a user field (or EOF) has been consumed
+                user_field_read = tag != self.TAG_ENDFILE
+                break
 
-                    continue
+        if not user_field_read and not self._eof:  # Error out when EOF is missing and file end is reached
+            raise MixedFieldsError('MISSING_EOF', 'Error, missing EOF field!')
 
-                if tag == self.TAG_ENDFILE:
-                    end_byte = fhandle.read(len(self.ENDBYTE_ENDFILE))
+        field_info = self.INFO
+        return {field_info.TAG: tag, field_info.PAYLOAD: chunk, field_info.ENDBYTE: end_byte}
 
-                    if end_byte != self.ENDBYTE_ENDFILE:
-                        raise MixedFieldsError('BAD_ENDFILE_ENDBYTE', f'Error, bad endfile endbyte: {str(end_byte)}')
+    def _check_field_order(self, tag):
+        # The header must come first, then the builtin metadata field
+        if not self._header and tag != self.TAG_HEADER:
+            raise MixedFieldsError('BAD_HEADER', f'Error, invalid file header: {str(tag)}')
+        if self._header and not self._metadata and tag != self.TAG_METADATA:
+            raise MixedFieldsError('BAD_METADATA_FIELD', 'Error, invalid file metadata tag!')
+
+    # Per-tag read_item handlers, return True when the
+    # field ends the read (a user field or EOF)
+
+    def _read_item_header(self, chunk, end_byte):
+        if not self._header:
+            if chunk != self.PAYLOAD_HEADER:
+                raise MixedFieldsError('BAD_HEADER_PAYLOAD', f'Error, bad header payload: {str(chunk)}')
+            self._header = self.TAG_HEADER + chunk + end_byte
+        return False
 
-                    self._eof = tag + end_byte
+    def _read_item_metadata(self, chunk, end_byte):
+        if not self._metadata:
+            if chunk != self.PAYLOAD_METADATA_EMPTY:
+                raise MixedFieldsError('BAD_METADATA_PAYLOAD', f'Error, bad metadata payload: {str(chunk)}')
+            self._metadata = self.TAG_METADATA + chunk + end_byte
+        return False
 
-                if self._eof:  # TODO make this behave differently...N files per physical file?
-                    self._head = fhandle.tell()
-                    break
+    def _read_item_endfile(self, chunk, end_byte):
+        # TODO make this behave differently...N files per physical file?
+        self._eof = self.TAG_ENDFILE + end_byte
+        return True
+
+    def _read_item_user_field(self, chunk, end_byte):
+        return True
+
+    # Tag dispatch for read_item (one dict probe per field instead of
+    # a cascade of tag compares)
+    _READ_ITEM_HANDLERS = {
+        TAG_HEADER: _read_item_header,
+        TAG_METADATA: _read_item_metadata,
+        TAG_ENDFILE: _read_item_endfile,
+        TAG_DATA: _read_item_user_field,
+        TAG_EXTRA_METADATA: _read_item_user_field,
+    }
 
-                # Read the end byte last (there are plans for fixed length payloads which have to be read first)
-                end_byte = fhandle.read(len(self.ENDBYTE_HEADER))
-                if tag == self.TAG_DATA:
-                    if end_byte != self.ENDBYTE_DATA:
-                        raise MixedFieldsError('BAD_DATA_ENDBYTE', f'Error, bad data endbyte: {str(end_byte)}')
-                if tag == self.TAG_EXTRA_METADATA:
-                    if end_byte != self.ENDBYTE_EXTRA_METADATA:
-                        raise MixedFieldsError('BAD_EXTRA_METADATA_ENDBYTE', f'Error, bad extra metadata endbyte: {str(end_byte)}')
+    def _build_offset_index(self):
+        # Walk the file once, decoding only tags and size subfields (to
+        # skip payloads), and record where each user field starts
+        if self._offsets is not None:
+            return self._offsets
+
+        mm = self._open_read()
+        offsets = []
+        pos = 0
+        total = len(mm)
+        while pos < total:
+            field_start = pos
+            tag = mm[pos:pos + self.TAG_SIZE]
+            if self._TAG_BY_NAME.get(tag[1:]) != tag:
+                raise MixedFieldsError('BAD_TAG', 'Error, invalid tag')
+            pos += self.TAG_SIZE
+
+            # Skip over the payload (decode the size subfield if present)
+            if tag in self._VAR_LEN_TAGS:
+                size_value, pos = self._decode_size_subfield_at(mm, pos)
+                pos += size_value
+            elif tag == self.TAG_HEADER:
+                pos += len(self.PAYLOAD_HEADER)
+            pos += 1  # Field endbyte
+
+            if tag == self.TAG_DATA or tag == self.TAG_EXTRA_METADATA:
+                offsets.append(field_start)
+
+        self._offsets = offsets
+        return offsets
+
+    # Random access read of the Nth user field (data/extra metadata),
+    # using a positional index built on first use
+    def read_item_at(self, index):
+        if not self._path_set():
+            raise MixedFieldsError('PATH_NONE', 'Error, path is not set')
+        if self._dirty_state():
+            raise MixedFieldsError('DIRTY_STATE', 'Error, cannot read from an unfinalized file')
 
-                # Stop reading once a field has been consumed
-                if tag in {self.TAG_DATA, self.TAG_EXTRA_METADATA}:
-                    user_field_read = True
+        offsets = self._build_offset_index()
+        if not (0 <= index < len(offsets)):
+            raise MixedFieldsError('BAD_ITEM_INDEX', f'Error, no item at index {index}')
 
-                # Store seek position for subsequent reads
-                self._head = fhandle.tell()
+        # Parse the single field in place, without
+        # disturbing the sequential read position
+        saved_head = self._head
+        try:
+            self._head = offsets[index]
+            return self._read_field()
+        finally:
+            self._head = saved_head
+
+    # Stream every user item payload (data/extra metadata) as a
+    # zero-copy view into the mapped file. Views are only valid while
+    # the file stays open -- call .tobytes() on one for owned bytes
+    def iter_items(self):
+        if not self._path_set():
+            raise MixedFieldsError('PATH_NONE', 'Error, path is not set')
+        if self._dirty_state():
+            raise MixedFieldsError('DIRTY_STATE', 'Error, cannot read from an unfinalized file')
 
-        if not chunk and not self._eof:  # Error out when EOF is missing and file end is reached
-            raise MixedFieldsError('MISSING_EOF', 'Error, missing EOF field!')
+        mm = self._open_read()
+        view = memoryview(mm)
+        try:
+            pos = 0
+            total = len(mm)
+            while pos < total:
+                tag = mm[pos:pos + self.TAG_SIZE]
+                if self._TAG_BY_NAME.get(tag[1:]) != tag:
+                    raise MixedFieldsError('BAD_TAG', 'Error, invalid tag')
+                pos += self.TAG_SIZE
 
-        field_info = self.INFO
-        return {field_info.TAG: tag, field_info.PAYLOAD: chunk, field_info.ENDBYTE: end_byte}
+                # Hop over the payload (decoding the size subfield if present)
+                size_value = 0
+                payload_start = pos
+                if tag in self._VAR_LEN_TAGS:
+                    size_value, pos = self._decode_size_subfield_at(mm, pos)
+                    payload_start = pos
+                    pos += size_value
+                elif tag == self.TAG_HEADER:
+                    pos += len(self.PAYLOAD_HEADER)
+                pos += 1  # Field endbyte
+
+                if tag == self.TAG_DATA or tag == self.TAG_EXTRA_METADATA:
+                    yield view[payload_start:payload_start + size_value]
+        finally:
+            view.release()
+
+    def item_count(self):
+        if not self._path_set():
+            raise MixedFieldsError('PATH_NONE', 'Error, path is not set')
+        if self._dirty_state():
+            raise MixedFieldsError('DIRTY_STATE', 'Error, cannot read from an unfinalized file')
+        return len(self._build_offset_index())
 
     def _write_field(self, tag, item_bytes, end_byte):
-        return self._write(tag + item_bytes + end_byte)
+        # Pack into one preallocated buffer, chained + concatenation
+        # would copy the payload twice
+        tag_len = len(tag)
+        item_len = len(item_bytes)
+        field_bytes = bytearray(tag_len + item_len + len(end_byte))
+        field_bytes[:tag_len] = tag
+        field_bytes[tag_len:tag_len + item_len] = item_bytes
+        field_bytes[tag_len + item_len:] = end_byte
+        return self._write(field_bytes)
 
     def _write(self, item_bytes):
-        status = SimpleNamespace(STATUS='OK', BYTE_COUNT=0, ERRORS=[])
         try:
-            with open(self._path, 'ab') as fhandle:
-                status.BYTE_COUNT += fhandle.write(
-                    item_bytes
-                )
-                fhandle.flush()
-                self._bytes_written += status.BYTE_COUNT
-        except Exception as err:
-            status.STATUS = 'ERROR'
-            status.ERRORS.append(MixedFieldsError('FILE_WRITE_ERROR', 'Error writing file', traceback.format_exc()))
-
-        return status
+            fd = self._open_write()
+            written = os.write(fd, item_bytes)
+            while written < len(item_bytes):  # os.write can be partial
+                written += os.write(fd, item_bytes[written:])
+            self._bytes_written += written
+        except OSError as err:
+            # Only real I/O failures get converted to a status --
+            # programmer errors (and KeyboardInterrupt etc.) propagate
+            import traceback
+            return WriteStatus(
+                STATUS='ERROR',
+                BYTE_COUNT=0,
+                ERRORS=(MixedFieldsError('FILE_WRITE_ERROR', 'Error writing file', traceback.format_exc()),),
+            )
+
+        return WriteStatus(STATUS='OK', BYTE_COUNT=written, ERRORS=())
 
     def _write_header_field(self):
         if not self._path_set():
@@ -383,8 +603,32 @@ class MixedFields:
             raise MixedFieldsError('PATH_NONE', 'Error, path is not set')
         return self._write(self.METADATA_FIELD_8_EMPTY)
 
+    def _write_initial_blob(self):
+        # Header and empty metadata go out as one write
+        if not self._path_set():
+            raise MixedFieldsError('PATH_NONE', 'Error, path is not set')
+        return self._write(self._INITIAL_BLOB)
+
     @staticmethod
     def get_size_subfield(size):
+        # Small sizes (the overwhelming majority of payloads) come
+        # straight from the precomputed table
+        if 0 <= size < (1 << 14):
+            return MixedFields._SIZE_LUT[size]
+        return MixedFields._compute_size_subfield(size)
+
+    @staticmethod
+    def _size_subfield_len(size):
+        """Encoded length in bytes of the size subfield for the given size"""
+        if size == 0:
+            # Size fields are a minimum of 1 byte
+            return 1
+        bits_per_byte = MixedFields.SIZE_BITS_PER_SIZE_BYTE
+        return (size.bit_length() + bits_per_byte - 1) // bits_per_byte
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _compute_size_subfield(size):
         if size == 0:
             # Size fields are a minimum of 1 byte
             return b'\x00'
@@ -395,45 +639,31 @@ class MixedFields:
         # be present on the MSB of the last byte of the size field).
         #
         # Example: 1023 = size_bin = 0b11_1111_1111 --> Field = (1)000_0111  (0)111_1111
-        size_field_bits = b''
-        bit_string = bin(size)[2:]  # Length as a binary string with the 0b stripped off (digits only)
+        bits_per_byte = MixedFields.SIZE_BITS_PER_SIZE_BYTE
 
-        # We need groups of 7 bits (starting from the LSB), strip off any
-        # leading remainder bits (a 10 bit size would have a (% 7) 3 bit remainder
-        remainder = len(bit_string) % MixedFields.SIZE_BITS_PER_SIZE_BYTE
+        # We need groups of 7 bits (starting from the LSB), the leading
+        # byte holds any remainder bits (a 10 bit size would have 3)
+        byte_count = (size.bit_length() + bits_per_byte - 1) // bits_per_byte
 
         # Get the "packed" size field bytes (with carrier
         # bits added), starting with the leading byte
-        most_sig_byte = b''
-        if remainder:
-            leading_bits_as_num = int(bit_string[:remainder], 2)
-            if len(bit_string) / MixedFields.SIZE_BITS_PER_SIZE_BYTE > 1:
-                leading_bits_as_num = leading_bits_as_num | 0b10_00_00_00
-
-            most_sig_byte = leading_bits_as_num.to_bytes(1, 'big')
-        size_field_bits += most_sig_byte
-        # ....
-        position = remainder
-        while position < len(bit_string):
-            chunk_as_num = int(bit_string[position: position + MixedFields.SIZE_BITS_PER_SIZE_BYTE], 2)
-
-            position += MixedFields.SIZE_BITS_PER_SIZE_BYTE
-            if position < len(bit_string):
+        size_field_bits = bytearray()
+        for position in range(byte_count - 1, -1, -1):
+            chunk_as_num = (size >> (position * bits_per_byte)) & 0b0111_1111
+            if position:
                 # If there are additional bytes coming, set the leading bit to 1
                 chunk_as_num = chunk_as_num | 0b10_00_00_00
-            size_field_bits += chunk_as_num.to_bytes(1, 'big')
+            size_field_bits.append(chunk_as_num)
 
-        return size_field_bits
+        return bytes(size_field_bits)
 
     @staticmethod
     def read_size_subfield(size_field_bytes):
-        size_value_bit_string = ''
+        # Accumulate the 7 value bits of each size byte (MSB group
+        # first), stripping the leading carrier digit off as we go
+        size_value = 0
         for bb in size_field_bytes:
-            size_bits_no_carrier = bb & 0b0111_1111  # Strip the leading carrier digit off
-            format_specifier = f'0>{MixedFields.SIZE_BITS_PER_SIZE_BYTE}'
-            size_bit_chunk = f'{bin(size_bits_no_carrier)[2:]:{format_specifier}}'  # Remove '0b' and Pad to 7 bits
-            size_value_bit_string += size_bit_chunk
-        size_value = int(size_value_bit_string, 2)
+            size_value = (size_value << MixedFields.SIZE_BITS_PER_SIZE_BYTE) | (bb & 0b0111_1111)
         return size_value
 
     def write_item(self, item_bytes, tag=TAG_DATA):
@@ -442,22 +672,68 @@ class MixedFields:
         if not (tag in {self.TAG_DATA, self.TAG_EXTRA_METADATA}):
             raise MixedFieldsError('INVALID_WRITE_TAG', 'Error, can only write TAG_DATA and TAG_EXTRA_METADATA fields')
         self._finalized_file_write = False
-
-        # Write header/metadata if needed
-        with open(self._path, 'ab') as fhandle:
-            if self._bytes_written == 0:
-                self._write_header_field()
-                self._write_metadata()
+        self._close_read()  # File contents are changing, drop any stale map
+        self._offsets = None
 
         # TODO support additional field types, better handling
         desired_tag = tag
         desired_endbyte = self.ENDBYTE_DATA if tag == self.TAG_DATA else self.ENDBYTE_EXTRA_METADATA
 
-        # Write length field and user bytes
+        # Pack the tag, length field, user bytes, and endbyte (plus
+        # header/metadata when the file is fresh) into a single write
         item_size_field = self.get_size_subfield(len(item_bytes))
-        self._write_field(desired_tag, item_size_field + item_bytes, desired_endbyte)
+        field_bytes = b''.join([desired_tag, item_size_field, item_bytes, desired_endbyte])
+        if self._bytes_written == 0:
+            field_bytes = self._INITIAL_BLOB + field_bytes
+        self._write(field_bytes)
+
+    # Write a batch of items with a single write call
+    def write_items(self, items, tag=TAG_DATA):
+        if not self._path_set():
+            raise MixedFieldsError('PATH_NONE', 'Error, path is not set')
+        if not (tag in {self.TAG_DATA, self.TAG_EXTRA_METADATA}):
+            raise MixedFieldsError('INVALID_WRITE_TAG', 'Error, can only write TAG_DATA and TAG_EXTRA_METADATA fields')
+        self._finalized_file_write = False
+        self._close_read()  # File contents are changing, drop any stale map
+        self._offsets = None
+
+        desired_endbyte = self.ENDBYTE_DATA if tag == self.TAG_DATA else self.ENDBYTE_EXTRA_METADATA
+
+        # Size the outgoing buffer exactly, then pack every field
+        # (with header/metadata if needed) into it by offset
+        items = list(items)  # The batch gets two passes
+        prefix = self._INITIAL_BLOB if self._bytes_written == 0 else b''
+        total = len(prefix) + sum(
+            self.TAG_SIZE + self._size_subfield_len(len(item_bytes)) + len(item_bytes) + 1
+            for item_bytes in items
+        )
+        buffer = bytearray(total)
+
+        buffer[:len(prefix)] = prefix
+        pos = len(prefix)
+        for item_bytes in items:
+            buffer[pos:pos + self.TAG_SIZE] = tag
+            pos += self.TAG_SIZE
+            size_field = self.get_size_subfield(len(item_bytes))
+            buffer[pos:pos + len(size_field)] = size_field
+            pos += len(size_field)
+            buffer[pos:pos + len(item_bytes)] = item_bytes
+            pos += len(item_bytes)
+            buffer[pos:pos + 1] = desired_endbyte
+            pos += 1
+
+        self._write(buffer)
 
     def close(self):
         if self._bytes_written > 0 and not self._finalized_file_write:
             self._write(self.ENDFILE)
         self._finalized_file_write = True
+        self._close_write()
+        self._close_read()
+
+
+# Precomputed size subfield encodings for small sizes (1 and 2 byte
+# encodings), indexed by size -- the common case for write_item
+MixedFields._SIZE_LUT = tuple(
+    MixedFields._compute_size_subfield(size) for size in range(1 << 14)
+)